@@ -1,24 +1,39 @@
 # app.py
+import hashlib
+import hmac
+import json
+import logging
+import operator
 import os
+import queue
+import re
 import sqlite3
-import traceback
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from datetime import timedelta, datetime
-from functools import wraps
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 
 from dotenv import load_dotenv
 load_dotenv()
 
 from flask import (
-    Flask, render_template, request, redirect, url_for,
-    session, flash, jsonify
+    Flask, Response, render_template, request, redirect, url_for,
+    session, flash
 )
+from flask.json.provider import DefaultJSONProvider
+from flask.logging import default_handler
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.exceptions import BadRequest
-from jinja2 import TemplateNotFound
+from jinja2 import FileSystemBytecodeCache, TemplateNotFound
+from playwright.sync_api import sync_playwright
 
 # Local drivers
-from robot_driver import search_product  # Playwright product bot
-from login_driver import run_login_test  # Playwright demo-login bot
+from robot_driver import (  # Playwright product bot
+    search_product, category_choices, list_categories_http, block_heavy_assets
+)
+from login_driver import LOGIN_TIMEOUT_S, run_login_test  # Playwright demo-login bot
+from ttl_cache import TTLCache
 
 # ------------------------------------------------------------------------------
 # App setup
@@ -39,12 +54,17 @@ DB_PATH = os.path.join(BASE_DIR, "users.db")
 
 # Optional API key for JSON endpoints (set in env)
 REQUIRED_API_KEY = os.environ.get("API_KEY")  # e.g., 'secret123'
+# Encoded once for hmac.compare_digest: the UTF-8 bytes a client sends. Never
+# "replace" here: mapping characters to "?" would let forged keys match.
+_API_KEY_BYTES = REQUIRED_API_KEY.encode("utf-8") if REQUIRED_API_KEY else None
 
 # Content-Security-Policy (relax for MCP/local testing via RELAXED_CSP=1)
 RELAXED_CSP = os.environ.get("RELAXED_CSP") in ("1", "true", "True")
 
 # Default admin seed (local only)
 SEED_ADMIN = os.environ.get("ADMIN_DEFAULT", "1") in ("1", "true", "True")
+# Optional pre-computed hash for the seeded admin (skips the KDF at boot)
+ADMIN_HASH = os.environ.get("ADMIN_HASH") or None
 
 # Speed & UA (used by playbook runs)
 CUSTOM_UA = (
@@ -55,51 +75,207 @@ CUSTOM_UA = (
     )
 )
 
+# Logging: request threads only enqueue records; formatting (tracebacks included)
+# and the stderr write happen on a listener thread.
+class _DeferredQueueHandler(QueueHandler):
+    def prepare(self, record):
+        return record  # stock prepare() formats here, on the caller's thread
+
+
+_log_handler = _DeferredQueueHandler(queue.SimpleQueue())
+app.logger.removeHandler(default_handler)
+app.logger.addHandler(_log_handler)
+
+# Driver progress lines go through the same queue instead of print()
+for _name in ("login_driver", "mcp_agent", "robot_driver"):
+    _driver_logger = logging.getLogger(_name)
+    _driver_logger.setLevel(logging.INFO)
+    _driver_logger.addHandler(_log_handler)
+    _driver_logger.propagate = False
+
+
+def _start_log_listener():
+    # Fresh queue per process: a forked child must not share the parent's
+    _log_handler.queue = queue.SimpleQueue()
+    QueueListener(_log_handler.queue, default_handler, respect_handler_level=True).start()
+
+
+_start_log_listener()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_start_log_listener)
+
+# Templates: compile once, never stat() the files again at request time.
+# JINJA_CACHE_DIR additionally persists compiled bytecode across restarts.
+app.jinja_env.auto_reload = False
+if os.environ.get("JINJA_CACHE_DIR"):
+    os.makedirs(os.environ["JINJA_CACHE_DIR"], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(os.environ["JINJA_CACHE_DIR"])
+
+for _tpl in ("login.html", "register.html", "search.html", "index.html"):
+    try:
+        app.jinja_env.get_template(_tpl)  # warms the env cache used by render_template
+    except TemplateNotFound:
+        pass  # reported per request by the TemplateNotFound handler
+
+# Password hashing: Argon2id when argon2-cffi is installed (safe if unavailable,
+# falls back to Werkzeug PBKDF2). Old PBKDF2 rows are upgraded on next login.
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHash, VerificationError
+
+    _ph = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+except Exception:
+    _ph = None
+
+# Optional fast JSON (safe if unavailable): used for API responses and, via the
+# provider below, for app.json / request.get_json parsing.
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+
+# Optional response compression for the JSON APIs (safe if unavailable)
+try:
+    from flask_compress import Compress
+
+    app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+    app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+    app.config["COMPRESS_BR_LEVEL"] = 4
+    app.config["COMPRESS_LEVEL"] = 4
+    app.config["COMPRESS_MIN_SIZE"] = 512
+    Compress(app)
+except Exception:
+    pass
+
 # Optional rate limiter (safe if unavailable)
 try:
     from flask_limiter import Limiter
     from flask_limiter.util import get_remote_address
 
-    limiter = Limiter(get_remote_address, app=app, default_limits=["60 per minute"])
+    limiter = Limiter(
+        get_remote_address, app=app,
+        default_limits=["60 per minute"], storage_uri="memory://"
+    )
 except Exception:
     limiter = None
 
 
+def _limit(spec: str, **kwargs):
+    """Per-route limiter.limit(...) decorator; a no-op when flask-limiter is missing."""
+    return limiter.limit(spec, **kwargs) if limiter else (lambda f: f)
+
+
 # ------------------------------------------------------------------------------
 # Security headers / session config
 # ------------------------------------------------------------------------------
-@app.after_request
-def set_secure_headers(resp):
-    resp.headers["X-Content-Type-Options"] = "nosniff"
-    resp.headers["Referrer-Policy"] = "no-referrer"
-    resp.headers["X-Frame-Options"] = "DENY"
-
-    if RELAXED_CSP:
-        # relaxed for local MCP/automation
-        resp.headers["Content-Security-Policy"] = (
-            "default-src 'self' 'unsafe-inline' 'unsafe-eval' data:; "
-            "img-src 'self' data:; connect-src 'self' http://localhost:* http://127.0.0.1:*;"
-        )
-    else:
-        # safer for normal runs
-        resp.headers["Content-Security-Policy"] = (
-            "default-src 'self'; img-src 'self' data:;"
-        )
-    return resp
+_HEADERS_BASE = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("Referrer-Policy", "no-referrer"),
+    ("X-Frame-Options", "DENY"),
+)
+# relaxed for local MCP/automation
+_HEADERS_RELAXED = _HEADERS_BASE + ((
+    "Content-Security-Policy",
+    "default-src 'self' 'unsafe-inline' 'unsafe-eval' data:; "
+    "img-src 'self' data:; connect-src 'self' http://localhost:* http://127.0.0.1:*;"
+),)
+# safer for normal runs
+_HEADERS_STRICT = _HEADERS_BASE + ((
+    "Content-Security-Policy",
+    "default-src 'self'; img-src 'self' data:;"
+),)
+# RELAXED_CSP is fixed for the process lifetime, so pick once
+SECURITY_HEADERS = _HEADERS_RELAXED if RELAXED_CSP else _HEADERS_STRICT
+
+
+# Applied by _edge_middleware (below the health section) at the WSGI layer, so
+# no Flask after_request hook runs for them.
+def _security_headers_for(headers: list) -> tuple:
+    # CSP only governs documents a browser renders; JSON replies skip the long header
+    for name, value in headers:
+        if name == "Content-Type":
+            return _HEADERS_BASE if value.startswith("application/json") else SECURITY_HEADERS
+    return SECURITY_HEADERS
+
+
+# Paths that never need the session flagged (static assets, machine APIs).
+# A tuple startswith() beats a compiled regex match here (~0.11µs vs ~0.17µs on
+# CPython 3.11); revisit if this grows past a handful of prefixes.
+_SESSIONLESS_PREFIXES = ("/static/", "/api/")
+
+# Page views that require a logged-in session (replaces a per-view decorator)
+_PROTECTED_ENDPOINTS = frozenset({"search_page", "demo_index"})
 
 
 @app.before_request
-def make_session_permanent():
-    session.permanent = True
+def auth_gate():
+    # Resolve the context-local proxies once; this hook runs on every request
+    req = request._get_current_object()
+    path = req.path
+    if path.startswith(_SESSIONLESS_PREFIXES):
+        return None
+    sess = session._get_current_object()
+    if req.endpoint in _PROTECTED_ENDPOINTS and "user" not in sess:
+        return redirect(url_for("login", next=path))
+    # Assigning always marks the session modified, so only flag it once. (The
+    # cookie is still re-sent each response: SESSION_REFRESH_EACH_REQUEST keeps
+    # the 30-minute lifetime sliding.)
+    if not sess.permanent:
+        sess.permanent = True
+    return None
 
 
 # ------------------------------------------------------------------------------
 # DB Helpers
 # ------------------------------------------------------------------------------
 
-def init_db():
+_db_local = threading.local()
+
+# Statement text is kept identical across calls so sqlite3's per-connection
+# statement cache reuses the compiled statements.
+_SQL_GET_USER = "SELECT username, password FROM users WHERE username = ?"
+_SQL_ADD_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+_SQL_SET_PASSWORD = "UPDATE users SET password = ? WHERE username = ?"
+_SQL_CACHE_GET = "SELECT body, exp FROM category_cache WHERE key = ?"
+_SQL_CACHE_PUT = "INSERT OR REPLACE INTO category_cache (key, body, exp) VALUES (?, ?, ?)"
+_SQL_CACHE_CLAIM = "UPDATE category_cache SET exp = ? WHERE key = ? AND exp = ?"
+
+
+def _get_conn() -> sqlite3.Connection:
+    """
+    Per-thread connection, opened on first use and reused for every later query
+    on that thread (autocommit; WAL lets readers and the writer overlap).
+    """
+    conn = getattr(_db_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-8000")  # 8 MB page cache
+        _db_local.conn = conn
+    return conn
+
+
+def init_db(seed_admin: bool = SEED_ADMIN):
+    """
+    Create the schema and, if seed_admin (ADMIN_DEFAULT=1), the local admin/admin123
+    account, all on one connection. The password is only hashed when the row is missing,
+    and not at all when ADMIN_HASH supplies a ready-made hash.
+    """
     try:
         with sqlite3.connect(DB_PATH) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
             cur = conn.cursor()
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -108,80 +284,166 @@ def init_db():
                     password TEXT NOT NULL
                 )
             """)
+            # Encoded replies shared by all worker processes (exp = epoch seconds)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS category_cache (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    exp INTEGER NOT NULL
+                )
+            """)
+            seeded = False
+            if seed_admin and not cur.execute("SELECT 1 FROM users WHERE username = ? LIMIT 1", ("admin",)).fetchone():
+                cur.execute(
+                    "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)",
+                    ("admin", ADMIN_HASH or hash_password("admin123"))
+                )
+                seeded = cur.rowcount == 1
             conn.commit()
         print(f"✅ Database initialized: {DB_PATH}")
-    except Exception as e:
+        if seeded:
+            print("✅ Seeded default admin user: " + ("admin (ADMIN_HASH)" if ADMIN_HASH else "admin / admin123"))
+    except sqlite3.Error as e:
         print(f"❌ Database init failed: {e}")
-        traceback.print_exc()
+        app.logger.exception("init_db failed")
 
 
 def _safe_query(fn):
+    # Only DB errors degrade to None; anything else is a bug and reaches the 500 handler
     try:
         return fn()
-    except sqlite3.OperationalError as e:
-        app.logger.error(f"SQLite OperationalError: {e}")
-        traceback.print_exc()
-        return None
-    except Exception as e:
-        app.logger.error(f"Unknown DB error: {e}")
-        traceback.print_exc()
+    except sqlite3.Error:
+        app.logger.exception("DB query failed")
         return None
 
 
+# username -> (username, password hash) row. Only found rows are cached, so a
+# user registered by another worker is seen at once; writes here evict the entry
+# and the TTL bounds staleness from writes made in other processes.
+_user_cache = TTLCache(maxsize=1024, ttl=300)
+
+
 def get_user(username: str):
+    row = _user_cache.get(username)
+    if row is not None:
+        return row
+
     def _q():
-        with sqlite3.connect(DB_PATH) as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT username, password FROM users WHERE username = ?", (username,))
-            return cur.fetchone()
+        return _get_conn().execute(_SQL_GET_USER, (username,)).fetchone()
 
-    return _safe_query(_q)
+    row = _safe_query(_q)
+    if row is not None:
+        _user_cache.set(username, row)  # sqlite3 rows are tuples: immutable
+    return row
 
 
 def add_user(username: str, password_hash: str):
     def _q():
-        with sqlite3.connect(DB_PATH) as conn:
-            cur = conn.cursor()
-            cur.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password_hash))
-            conn.commit()
-            return True
+        _get_conn().execute(_SQL_ADD_USER, (username, password_hash))
+        return True
+
+    _user_cache.pop(username)
+    return _safe_query(_q)
+
+
+def update_password(username: str, password_hash: str):
+    def _q():
+        _get_conn().execute(_SQL_SET_PASSWORD, (password_hash, username))
+        return True
+
+    ok = _safe_query(_q)
+    _user_cache.pop(username)
+    return ok
+
+
+def cache_get(key: str):
+    """(body, exp) from the cross-process category_cache table, or None."""
+    def _q():
+        return _get_conn().execute(_SQL_CACHE_GET, (key,)).fetchone()
 
     return _safe_query(_q)
 
 
-def ensure_default_admin():
+def cache_put(key: str, body: bytes, exp: int):
+    def _q():
+        _get_conn().execute(_SQL_CACHE_PUT, (key, body, exp))
+        return True
+
+    return _safe_query(_q)
+
+
+def cache_claim(key: str, seen_exp: int, new_exp: int) -> bool:
     """
-    Local dev helper: seed an admin/admin123 account if ADMIN_DEFAULT=1.
+    Compare-and-set on an expired row's exp: of all workers that saw `seen_exp`,
+    exactly one gets True and should refresh; the rest keep serving the old body.
     """
-    if not SEED_ADMIN:
-        return
-    admin = get_user("admin")
-    if not admin:
-        try:
-            add_user("admin", generate_password_hash("admin123"))
-            print("✅ Seeded default admin user: admin / admin123")
-        except Exception as e:
-            print(f"⚠️ Failed to seed admin: {e}")
+    def _q():
+        return _get_conn().execute(_SQL_CACHE_CLAIM, (new_exp, key, seen_exp)).rowcount == 1
+
+    return bool(_safe_query(_q))
 
 
 # ------------------------------------------------------------------------------
 # Auth utilities
 # ------------------------------------------------------------------------------
 MAX_CRED_LENGTH = 50
+CRED_ERROR = f"Username and password must be 1–{MAX_CRED_LENGTH} characters (no control characters)."
+
+# Presence, length and charset checked in a single compiled pass per field
+_CRED_MATCH = re.compile(r"[^\x00-\x1f\x7f]{1,%d}" % MAX_CRED_LENGTH).fullmatch
+
+
+def _valid_cred(x: str) -> bool:
+    return bool(x and _CRED_MATCH(x))
+
+
+def hash_password(password: str) -> str:
+    return _ph.hash(password) if _ph else generate_password_hash(password)
 
 
-def _too_long(x: str) -> bool:
-    return x is None or len(x) > MAX_CRED_LENGTH
+def verify_password(stored_hash: str, password: str) -> bool:
+    if stored_hash.startswith("$argon2"):
+        if _ph is None:
+            return False
+        try:
+            return _ph.verify(stored_hash, password)
+        except (VerificationError, InvalidHash):
+            return False
+    return check_password_hash(stored_hash, password)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    if _ph is None:
+        return False
+    return not stored_hash.startswith("$argon2") or _ph.check_needs_rehash(stored_hash)
+
+
+# Verified against on unknown usernames (never matches a real password)
+_DUMMY_HASH = hash_password(os.urandom(16).hex())
+
+# Successful password checks, keyed by HMAC(secret, "user:password") so the
+# cache never holds plaintext. Value is (username, stored_hash): a changed hash
+# in the DB misses automatically.
+_auth_cache = TTLCache(maxsize=1024, ttl=60)
+
 
+def _auth_key(username: str, password: str) -> bytes:
+    return hmac.new(app.secret_key.encode(), f"{username}:{password}".encode(), hashlib.sha256).digest()
 
-def login_required(view_func):
-    @wraps(view_func)
-    def wrapper(*args, **kwargs):
-        if "user" not in session:
-            return redirect(url_for("login", next=request.path))
-        return view_func(*args, **kwargs)
 
-    return wrapper
+def _check_password(username: str, stored_hash: str, password: str) -> bool:
+    """verify_password, skipping the KDF work for a recently verified login."""
+    key = _auth_key(username, password)
+    if _auth_cache.get(key) == (username, stored_hash):
+        return True
+    ok = verify_password(stored_hash, password)
+    if ok:
+        _auth_cache.set(key, (username, stored_hash))
+    return ok
+
+
+def _forget_auth(username: str):
+    _auth_cache.discard_where(lambda v: v[0] == username)
 
 
 def auth_or_api_key_ok() -> bool:
@@ -190,12 +452,47 @@ def auth_or_api_key_ok() -> bool:
     """
     if "user" in session:
         return True
-    if REQUIRED_API_KEY:
-        provided = request.headers.get("X-API-Key")
-        return provided == REQUIRED_API_KEY
+    if _API_KEY_BYTES:
+        # Straight from the WSGI environ: skips the Headers wrapper's key normalization
+        provided = request.environ.get("HTTP_X_API_KEY", "")
+        # PEP 3333 header values are latin-1 decoded, so this yields the raw bytes
+        try:
+            raw = provided.encode("latin-1")
+        except UnicodeEncodeError:
+            return False
+        return hmac.compare_digest(raw, _API_KEY_BYTES)
     return False
 
 
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+# Passed as `headers=` so Response skips mimetype/charset resolution; Werkzeug
+# copies it into a fresh Headers object per response, so sharing is safe.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json(payload, status: int = 200) -> Response:
+    """
+    JSON Response for machine-facing endpoints (orjson when installed, no jsonify).
+    `payload` may also be pre-encoded bytes, e.g. one of the _ERR_* bodies below.
+    """
+    body = payload if type(payload) is bytes else _dumps(payload)
+    return Response(body, status=status, headers=_JSON_HEADERS)
+
+
+# Fixed error bodies, encoded once. Only the bytes are shared: a Response
+# object can't be, since after_request hooks (compression, rate-limit headers)
+# mutate each one.
+_ERR_UNAUTHORIZED = _dumps({"status": "error", "message": "Unauthorized"})
+_ERR_NOT_FOUND = _dumps({"status": "error", "message": "Endpoint not found", "agent": "BroncoMCP/1.0"})
+_ERR_INTERNAL = _dumps({"status": "error", "message": "Internal server error", "agent": "BroncoMCP/1.0"})
+_ERR_BAD_JSON = _dumps({"status": "error", "message": "Invalid JSON format."})
+
+
 def _bad_request(msg: str, extra: dict = None, code: int = 400):
     """Helper for uniform client errors with better debugging info"""
     payload = {
@@ -207,7 +504,58 @@ def _bad_request(msg: str, extra: dict = None, code: int = 400):
         payload["details"] = extra
     if app.debug:  # Only in debug mode
         payload["timestamp"] = datetime.now().isoformat()
-    return jsonify(payload), code
+    return _json(payload, code)
+
+
+# ------------------------------------------------------------------------------
+# Product search + login test (bounded driver pool; search results cached)
+# ------------------------------------------------------------------------------
+# Sized for the browser contexts the machine can hold; shared by product
+# searches and login tests so the two together never exceed it
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", "4"))
+SEARCH_TIMEOUT_S = 30
+MAX_QUERY_LENGTH = 100  # longer input is rejected before any browser work
+
+_driver_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="driver")
+_search_cache = TTLCache(maxsize=2048, ttl=300)
+_search_inflight = {}  # cache key -> Future of the scrape already running for it
+_search_inflight_lock = threading.Lock()
+
+
+def _settle_search(key, fut):
+    # Cache first, then unregister, so no caller in between misses both
+    try:
+        data = fut.result()
+        _search_cache.set(key, data, ttl=15 if data.get("status") == "error" else None)
+    except Exception:
+        pass
+    finally:
+        with _search_inflight_lock:
+            _search_inflight.pop(key, None)
+
+
+def cached_search(query: str, limit: int = 10) -> dict:
+    """
+    search_product() with a 5 minute cache keyed by (lower-cased query, limit).
+    Scrapes run on a bounded pool so concurrent misses can't start unlimited
+    browsers, and identical concurrent misses share one scrape (single-flight);
+    errors are cached for 15s only. Callers must not mutate the result.
+    """
+    if not is_known_category(query):
+        return category_choices(query, _CATS_NAMES)  # same reply the scraper gives, no browser
+    key = (query.lower(), limit)
+    data = _search_cache.get(key)
+    if data is None:
+        with _search_inflight_lock:
+            fut = _search_inflight.get(key)
+            started = fut is None
+            if started:
+                fut = _search_inflight[key] = _driver_pool.submit(search_product, query, limit=limit)
+        if started:
+            # Outside the lock: the callback runs inline if the scrape already finished
+            fut.add_done_callback(lambda f: _settle_search(key, f))
+        data = fut.result(timeout=SEARCH_TIMEOUT_S)
+    return data
 
 
 # ------------------------------------------------------------------------------
@@ -220,27 +568,25 @@ def home():
     return redirect(url_for("login"))
 
 
-route_login = app.route("/login", methods=["GET", "POST"])
-if limiter:
-    route_login = limiter.limit("5 per minute")(route_login)
-
-
-@route_login
+@app.route("/login", methods=["GET", "POST"])
+@_limit("5 per minute", methods=["POST"])
 def login():
     if request.method == "POST":
-        username = (request.form.get("username") or "").strip()
-        password = request.form.get("password") or ""
+        form = request.form
+        username = (form.get("username") or "").strip()
+        password = form.get("password") or ""
 
-        if _too_long(username) or _too_long(password):
-            flash(f"Credentials exceed {MAX_CRED_LENGTH} characters.", "error")
+        if not (_valid_cred(username) and _valid_cred(password)):
+            flash(CRED_ERROR, "error")
             return render_template("login.html"), 400
 
         user = get_user(username)
         if user is None:
-            flash("Database error — please try again later.", "error")
-            return render_template("login.html"), 500
-
-        if user and check_password_hash(user[1], password):
+            # Same KDF cost as a real check so unknown usernames can't be told apart by timing
+            verify_password(_DUMMY_HASH, password)
+        elif _check_password(username, user[1], password):
+            if needs_rehash(user[1]):
+                update_password(username, hash_password(password))
             session["user"] = username
             flash("Logged in successfully!", "success")
             return redirect(url_for("search_page"))
@@ -252,22 +598,25 @@ def login():
 @app.route("/register", methods=["GET", "POST"])
 def register():
     if request.method == "POST":
-        username = (request.form.get("username") or "").strip()
-        password = request.form.get("password") or ""
-        confirm = request.form.get("confirm") or ""
-
-        if _too_long(username) or _too_long(password):
-            flash(f"Credentials exceed {MAX_CRED_LENGTH} characters.", "error")
-            return render_template("register.html"), 400
+        form = request.form
+        username = (form.get("username") or "").strip()
+        password = form.get("password") or ""
+        confirm = form.get("confirm") or ""
 
         if not username or not password:
             flash("Please fill out all fields.", "error")
-        elif get_user(username):
+            return render_template("register.html")
+
+        if not (_valid_cred(username) and _valid_cred(password)):
+            flash(CRED_ERROR, "error")
+            return render_template("register.html"), 400
+
+        if get_user(username):
             flash("Username already exists.", "error")
         elif password != confirm:
             flash("Passwords do not match.", "error")
         else:
-            pw_hash = generate_password_hash(password)
+            pw_hash = hash_password(password)
             ok = add_user(username, pw_hash)
             if not ok:
                 flash("Database error — please try again later.", "error")
@@ -280,13 +629,29 @@ def register():
 
 @app.route("/logout")
 def logout():
-    session.pop("user", None)
+    user = session.pop("user", None)
+    if user:
+        _forget_auth(user)
     flash("Logged out.", "info")
     return redirect(url_for("login"))
 
 
+_ITEM_FIELDS = operator.itemgetter("title", "price")
+
+
+def _format_items(data: dict, shown: int = 5):
+    """Render the first `shown` items as the text card; None if an item is malformed."""
+    items = data.get("items") or []
+    if not items:
+        return "No items found."
+    try:
+        lines = ["  • %s — %s" % _ITEM_FIELDS(item) for item in items[:shown]]
+    except (KeyError, TypeError):
+        return None
+    return f"Found {len(items)} items in {data.get('category', 'category')}:\n" + "\n".join(lines) + "\n"
+
+
 @app.route("/search", methods=["GET", "POST"])
-@login_required
 def search_page():
     """
     HTML page for the demo flow (Books to Scrape).
@@ -299,18 +664,15 @@ def search_page():
         query = (request.form.get("query") or "").strip()
         if not query:
             error = "Please type a product to search."
+        elif len(query) > MAX_QUERY_LENGTH:
+            error = f"Search text is too long (max {MAX_QUERY_LENGTH} characters)."
         else:
             try:
-                data = search_product(query)
+                data = cached_search(query)
                 if data.get("status") == "success":
-                    # Format multiple items
-                    items = data.get("items", [])
-                    if items:
-                        result = f"Found {len(items)} items in {data.get('category', 'category')}:\n"
-                        for item in items[:5]:  # Show first 5
-                            result += f"  • {item.get('title')} — {item.get('price')}\n"
-                    else:
-                        result = "No items found."
+                    result = _format_items(data)
+                    if result is None:
+                        error = "Search returned malformed items."
                 else:
                     error = data.get("message", "Search failed.")
             except Exception as e:
@@ -320,7 +682,6 @@ def search_page():
 
 # NEW ROUTE: Demo console (the index.html page)
 @app.route("/demo")
-@login_required
 def demo_index():
     """
     Serves the demo console (index.html) - the AJAX interface
@@ -332,45 +693,147 @@ def demo_index():
 # JSON APIs (session OR API key)
 # ------------------------------------------------------------------------------
 
+# Serialized /categories.json reply, scraped and encoded at most once per
+# CATS_TTL_S across all workers (via the category_cache table). Published as one
+# (body, headers, expires) tuple so readers never pair a new body with an old
+# Content-Length. A failed refresh keeps serving the last good list for
+# CATS_STALE_S more; a failed first scrape isn't cached.
+CATS_TTL_S = 600
+CATS_STALE_S = 60
+_CATS_KEY = "categories"
+_CATS = None
+_CATS_LOCK = threading.Lock()
+# Scraped names: display order, a set of lower-cased names for exact hits, and
+# _CATS_BLOB, the lower-cased names joined with NULs so one C-level `in` does
+# the substring match instead of a per-name loop.
+_CATS_NAMES = ()
+_CATS_EXACT = frozenset()
+_CATS_BLOB = ""
+
+
+def is_known_category(query: str) -> bool:
+    """
+    Whether search_product() could match `query` (exact, else substring, case-insensitive,
+    like robot_driver._find_category_url). True while the category list isn't loaded yet.
+    """
+    if not _CATS_BLOB:
+        return True
+    q = query.strip().lower()
+    return bool(q) and "\0" not in q and (q in _CATS_EXACT or q in _CATS_BLOB)
+
+
+def _scrape_categories() -> list:
+    # Plain HTTP + regex first (no browser); Playwright only if that fails
+    try:
+        cats = list_categories_http()
+        if cats:
+            return cats
+    except Exception as e:
+        app.logger.warning(f"HTTP category fetch failed, using Playwright: {e}")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        ctx = browser.new_context(user_agent=CUSTOM_UA)
+        block_heavy_assets(ctx)
+        page = ctx.new_page()
+        page.goto("https://books.toscrape.com/", timeout=15000, wait_until="domcontentloaded")
+        cats = page.eval_on_selector_all(
+            "ul.nav-list li ul li a",
+            "els => els.map(e => e.textContent.trim())"
+        )
+        browser.close()
+    # Clean + de-duplicate in one pass, keeping page order
+    return list(dict.fromkeys(s for c in (cats or ()) if (s := str(c).strip())))
+
+
+def _publish_categories(cats: list, body: bytes, ttl: float) -> tuple:
+    """Install `cats` and its encoded `body` as this process's copy for `ttl` seconds."""
+    global _CATS, _CATS_NAMES, _CATS_EXACT, _CATS_BLOB
+    _CATS_NAMES = tuple(cats)
+    lower = [c.lower() for c in cats]
+    _CATS_EXACT = frozenset(lower)
+    _CATS_BLOB = "\0".join(lower)
+    # Validator derived from the body, so every worker serving it agrees
+    etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+    headers = {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(body)),
+        "ETag": f'"{etag}"',
+        "Cache-Control": "private, no-cache",
+    }
+    _CATS = (body, headers, time.monotonic() + ttl)
+    return body, headers
+
+
+def _categories() -> tuple:
+    """
+    (body, headers) for /categories.json. Lookup order: this process's copy, then
+    the category_cache row shared by all workers, then a scrape. On expiry only
+    the worker that wins cache_claim() scrapes; the others serve the old body.
+    """
+    cached = _CATS
+    if cached is not None and time.monotonic() < cached[2]:
+        return cached[0], cached[1]
+    with _CATS_LOCK:
+        cached = _CATS
+        if cached is not None and time.monotonic() < cached[2]:
+            return cached[0], cached[1]
+        now = int(time.time())
+        shared = cache_get(_CATS_KEY)
+        if shared is not None:
+            body, exp = shared
+            if exp > now or not cache_claim(_CATS_KEY, exp, now + CATS_STALE_S):
+                ttl = exp - now if exp > now else CATS_STALE_S
+                return _publish_categories(json.loads(body)["categories"], body, ttl)
+        try:
+            cats = _scrape_categories()
+            if not cats:
+                raise RuntimeError("category scrape returned no categories")
+        except Exception:
+            if shared is not None:
+                app.logger.exception("categories refresh failed; serving the previous list")
+                return _publish_categories(json.loads(shared[0])["categories"], shared[0], CATS_STALE_S)
+            if cached is None:
+                raise
+            app.logger.exception("categories refresh failed; serving the previous list")
+            return _publish_categories(_CATS_NAMES, cached[0], CATS_STALE_S)
+        body = _dumps({
+            "status": "success",
+            "count": len(cats),
+            "categories": cats,
+            "agent": "BroncoMCP/1.0"
+        })
+        cache_put(_CATS_KEY, body, now + CATS_TTL_S)
+        return _publish_categories(cats, body, CATS_TTL_S)
+
+
 @app.route("/categories.json", methods=["GET"])
 def categories_json():
     """
     Returns the list of Books to Scrape categories as JSON.
     Allowed for logged-in users or clients presenting X-API-Key.
+    Answers 304 (no body) when If-None-Match carries the current ETag.
     """
     if not auth_or_api_key_ok():
-        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+        return _json(_ERR_UNAUTHORIZED, 401)
 
     try:
-        from playwright.sync_api import sync_playwright
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            ctx = browser.new_context(user_agent=CUSTOM_UA)
-            page = ctx.new_page()
-            page.goto("https://books.toscrape.com/", timeout=15000, wait_until="domcontentloaded")
-            cats = page.eval_on_selector_all(
-                "ul.nav-list li ul li a",
-                "els => els.map(e => e.textContent.trim())"
-            )
-            browser.close()
-        # De-duplicate / clean
-        cats = [c for c in (cats or []) if c]
-        return jsonify({
-            "status": "success",
-            "count": len(cats),
-            "categories": cats,
-            "agent": "BroncoMCP/1.0"
-        }), 200
+        body, headers = _categories()
+        # Substring test also matches the weak/suffixed tag flask-compress hands out
+        inm = request.environ.get("HTTP_IF_NONE_MATCH")
+        if inm and headers["ETag"].strip('"') in inm:
+            return Response(status=304, headers={"ETag": headers["ETag"], "Cache-Control": headers["Cache-Control"]})
+        return Response(body, status=200, headers=headers)
     except Exception as e:
         app.logger.exception("categories.json failed")
-        return jsonify({
+        return _json({
             "status": "error",
             "message": str(e),
             "agent": "BroncoMCP/1.0"
-        }), 500
+        }, 500)
 
 
 @app.route("/search-json", methods=["POST"])
+@_limit("5 per second")
 def search_json():
     """
     JSON API for product/category search used by MCP.
@@ -379,10 +842,13 @@ def search_json():
     - Includes 'status', 'agent', 'category', 'meta'
     - On scraper failure, returns items=[]
     - When no match found (status="choices"), includes 'categories' array
+    Allowed for logged-in users or clients presenting X-API-Key (checked before the body is read).
     """
-    try:
-        body = request.get_json(force=True, silent=True) or {}
-    except Exception:
+    if not auth_or_api_key_ok():
+        return _json({"status": "error", "message": "Unauthorized", "items": []}, 401)
+
+    body = request.get_json(force=True, silent=True, cache=False)
+    if not isinstance(body, dict):
         body = {}
 
     # Accept both keys
@@ -394,16 +860,23 @@ def search_json():
         limit = 0
 
     if not category:
-        return jsonify({
+        return _json({
             "agent": "BroncoMCP/1.0",
             "status": "error",
             "message": "Missing 'product' or 'category' in JSON payload.",
             "items": []
-        }), 400
+        }, 400)
+    if len(category) > MAX_QUERY_LENGTH:
+        return _json({
+            "agent": "BroncoMCP/1.0",
+            "status": "error",
+            "message": f"'product'/'category' is too long (max {MAX_QUERY_LENGTH} characters).",
+            "items": []
+        }, 400)
 
     # --- Call your scraper ---
     try:
-        data = search_product(category, limit=limit if limit > 0 else 10)
+        data = cached_search(category, limit=limit if limit > 0 else 10)
 
         # Normalize the shape we expect
         items = data.get("items", [])
@@ -432,19 +905,19 @@ def search_json():
             out["categories"] = data["categories"]
             out["message"] = data.get("message", f"No match for '{category}'")
 
-        return jsonify(out), 200
+        return _json(out, 200)
 
     except Exception as e:
         # Fallback: safe empty result with error info
         app.logger.exception("search-json scraper error")
-        return jsonify({
+        return _json({
             "agent": "BroncoMCP/1.0",
             "status": "error",
             "category": category,
             "message": str(e),
             "items": [],
             "meta": {"note": "scraper failure; returned empty list"}
-        }), 200
+        }, 200)
 
 
 @app.route("/login-test", methods=["POST"])
@@ -453,44 +926,120 @@ def login_test():
     JSON endpoint to run a demo login Playwright flow. Requires login or API key.
     """
     if not auth_or_api_key_ok():
-        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+        return _json(_ERR_UNAUTHORIZED, 401)
 
-    try:
-        data = request.get_json(force=True)
-    except BadRequest:
-        return jsonify({"status": "error", "message": "Invalid JSON format."}), 400
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 400
+    data = request.get_json(force=True, silent=True, cache=False)
+    if not isinstance(data, dict):
+        return _json(_ERR_BAD_JSON, 400)
 
     username = (data.get("username") or "").strip()
     password = data.get("password") or ""
 
-    if _too_long(username) or _too_long(password):
-        msg = f"Possible buffer overflow attempt: username or password exceeds allowed length ({MAX_CRED_LENGTH})."
+    if not (_valid_cred(username) and _valid_cred(password)):
+        msg = f"Rejected credentials: {CRED_ERROR}"
         app.logger.warning(msg)
-        return jsonify({"status": "error", "message": msg}), 400
+        return _json({"status": "error", "message": msg}, 400)
 
-    result = run_login_test(username=username, password=password)
-    return jsonify(result), 200 if result.get("status") == "success" else 500
+    # Same bounded pool as searches; the extra seconds cover time spent queued
+    try:
+        result = _driver_pool.submit(run_login_test, username=username, password=password) \
+            .result(timeout=LOGIN_TIMEOUT_S + 5)
+    except FuturesTimeout:
+        app.logger.warning("login test timed out")
+        return _json({"status": "error", "message": "Login test timed out."}, 504)
+    return _json(result, 200 if result.get("status") == "success" else 500)
 
 
 # ------------------------------------------------------------------------------
 # MCP "AI Brain" / health endpoints
 # ------------------------------------------------------------------------------
 
-@app.route("/api/health", methods=["GET"])
+HEALTH_PATH = "/api/health"
+
+
+# Static part of the health payload; only the epoch-seconds timestamp varies
+_HEALTH_PREFIX = json.dumps(
+    {"status": "ok", "agent": "BroncoMCP/1.0", "version": "1.0.0"}, separators=(",", ":")
+)[:-1].encode() + b',"timestamp":'
+
+
+# Epoch seconds refreshed by a daemon thread, so probes read a global instead
+# of calling time.time(). Restarted in forked workers (threads don't survive fork).
+_NOW = [int(time.time())]
+
+
+def _tick_clock():
+    while True:
+        _NOW[0] = int(time.time())
+        time.sleep(1.0 - time.time() % 1.0)  # wake just after each second boundary
+
+
+def _start_clock():
+    _NOW[0] = int(time.time())
+    threading.Thread(target=_tick_clock, name="clock", daemon=True).start()
+
+
+_start_clock()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_start_clock)
+
+
+@lru_cache(maxsize=1)
+def _health_at(ts: int) -> tuple:
+    """(body, Content-Length) for one epoch second; rebuilt only when the clock ticks."""
+    body = b"%s%d}" % (_HEALTH_PREFIX, ts)
+    return body, str(len(body))
+
+
+def _health_body() -> bytes:
+    return _health_at(_NOW[0])[0]
+
+
+def _edge_middleware(wsgi_app):
+    """
+    The one WSGI wrapper around Flask: answers health probes before dispatch
+    (no routing, session, rate limiting or hooks) and appends the security
+    headers to every other response. Auth stays in Flask (it needs the session).
+    """
+    def _app(environ, start_response):
+        if environ.get("PATH_INFO") == HEALTH_PATH and environ.get("REQUEST_METHOD") in ("GET", "HEAD"):
+            body, length = _health_at(_NOW[0])
+            start_response("200 OK", [
+                ("Content-Type", "application/json"),
+                ("Content-Length", length),
+                ("Cache-Control", "no-store"),
+                ("X-Content-Type-Options", "nosniff"),
+            ])
+            return [body] if environ["REQUEST_METHOD"] == "GET" else []
+
+        def _start(status, headers, exc_info=None):
+            headers.extend(_security_headers_for(headers))
+            return start_response(status, headers, exc_info)
+
+        return wsgi_app(environ, _start)
+
+    return _app
+
+
+app.wsgi_app = _edge_middleware(app.wsgi_app)
+
+
+_HEALTH_HEADERS = {**_JSON_HEADERS, "Cache-Control": "no-store"}
+
+
+@app.route(HEALTH_PATH, methods=["GET"])
 def api_health():
-    """Health check endpoint - accessible without authentication for monitoring"""
-    return jsonify({
-        "status": "ok",
-        "agent": "BroncoMCP/1.0",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }), 200
+    """Health check endpoint - accessible without authentication for monitoring.
+    Normally answered by _edge_middleware; kept for url_for and test clients."""
+    return Response(_health_body(), status=200, headers=_HEALTH_HEADERS)
 
 
 # --- /api/run: tolerant goal/steps runner for MCP "run_goal" ------------------
+MAX_GOALS_PER_RUN = 10  # cap for the batched {"goals": [...]} shape
+
+
 @app.route("/api/run", methods=["POST"])
+@_limit("5 per second")
 def api_run():
     """
     Tolerant endpoint used by MCP "run_goal"-style tools.
@@ -499,6 +1048,7 @@ def api_run():
     A) {"goal": "<plain english instruction>", "planner":"builtin|openai", "headless": true}
     B) {"navigate": "http://example.com"}  or {"url": "http://example.com"}
     C) {"steps": [ {"action":"navigate","url":"..."}, ... ] }
+    D) {"goals": ["<instruction>", ...]}  (run concurrently, up to MAX_GOALS_PER_RUN)
 
     Returns:
       200 with a structured result on success
@@ -506,10 +1056,10 @@ def api_run():
     """
     # Allow session or API key
     if not auth_or_api_key_ok():
-        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+        return _json(_ERR_UNAUTHORIZED, 401)
 
     # ---- parse safely
-    data = request.get_json(silent=True) or {}
+    data = request.get_json(force=True, silent=True, cache=False) or {}
     if not isinstance(data, dict):
         return _bad_request("Body must be a JSON object.")
 
@@ -528,45 +1078,68 @@ def api_run():
         elif isinstance(data.get("actions"), list):
             steps = data["actions"]
 
+    # case D: several goals → one shared browser, one context per goal, in parallel
+    goals = data.get("goals")
+    if not goal and isinstance(goals, list) and goals:
+        goals = [g.strip() for g in goals if isinstance(g, str) and g.strip()]
+        if not goals or len(goals) > MAX_GOALS_PER_RUN:
+            return _bad_request(f"goals must hold 1-{MAX_GOALS_PER_RUN} non-empty strings.")
+        try:
+            from mcp_agent import run_many  # lazy import to keep startup fast
+            results = run_many(goals, planner=planner, headless=headless)
+            return _json({
+                "status": "ok",
+                "agent": "BroncoMCP/1.0",
+                "planner": planner,
+                "results": results,
+            }, 200)
+        except Exception as e:
+            app.logger.exception("run_many failed")
+            return _json({
+                "status": "error",
+                "agent": "BroncoMCP/1.0",
+                "message": f"run_many failed: {e.__class__.__name__}",
+                "details": str(e),
+            }, 200)
+
     # case A: a plain goal → call your AI planner/runner
     if goal:
         try:
             from mcp_agent import run_ai_goal  # lazy import to keep startup fast
             result = run_ai_goal(goal=goal, planner=planner, headless=headless)
-            return jsonify({
+            return _json({
                 "status": "ok",  # Always return 200 with ok status, errors are in result
                 "agent": "BroncoMCP/1.0",
                 "planner": planner,
                 "result": result,
-            }), 200
+            }, 200)
         except Exception as e:
             app.logger.exception("run_ai_goal failed")
-            return jsonify({
+            return _json({
                 "status": "error",
                 "agent": "BroncoMCP/1.0",
                 "message": f"run_ai_goal failed: {e.__class__.__name__}",
                 "details": str(e),
-                "traceback": traceback.format_exc() if app.debug else None
-            }), 200  # Still return 200 to avoid breaking MCP clients
+            }, 200)  # Still return 200 to avoid breaking MCP clients
 
     # case B: explicit navigate/url → do a minimal Playwright nav (fast)
     if navigate_url:
         try:
-            from playwright.sync_api import sync_playwright
             with sync_playwright() as p:
                 browser = p.chromium.launch(headless=headless)
                 ctx = browser.new_context(user_agent=CUSTOM_UA)
+                block_heavy_assets(ctx)
                 page = ctx.new_page()
                 page.goto(navigate_url, timeout=15000, wait_until="domcontentloaded")
                 title = page.title()
                 browser.close()
-            return jsonify({
+            return _json({
                 "status": "success",
                 "agent": "BroncoMCP/1.0",
                 "action": "navigate",
                 "url": navigate_url,
                 "page_title": title
-            }), 200
+            }, 200)
         except Exception as e:
             app.logger.exception("navigate failed")
             return _bad_request("Navigation failed", {"error": str(e)}, code=200)
@@ -574,29 +1147,33 @@ def api_run():
     # case C: a list of steps → implement a tiny dispatcher (support 'navigate' now)
     if isinstance(steps, list):
         try:
-            from playwright.sync_api import sync_playwright
             outputs = []
+            counts = {"ok": 0, "error": 0, "skipped": 0}
             with sync_playwright() as p:
                 browser = p.chromium.launch(headless=headless)
                 ctx = browser.new_context(user_agent=CUSTOM_UA)
+                block_heavy_assets(ctx)
                 page = ctx.new_page()
                 for i, st in enumerate(steps, 1):
                     action = (st.get("action") or "").lower()
                     if action in ("navigate", "goto"):
                         url = st.get("url") or st.get("target")
                         if not url:
-                            outputs.append({"step": i, "status": "error", "message": "navigate requires url"})
-                            continue
-                        page.goto(url, timeout=15000, wait_until="domcontentloaded")
-                        outputs.append({"step": i, "status": "ok", "title": page.title()})
+                            out = {"step": i, "status": "error", "message": "navigate requires url"}
+                        else:
+                            page.goto(url, timeout=15000, wait_until="domcontentloaded")
+                            out = {"step": i, "status": "ok", "title": page.title()}
                     else:
-                        outputs.append({"step": i, "status": "skipped", "action": action or "unknown"})
+                        out = {"step": i, "status": "skipped", "action": action or "unknown"}
+                    counts[out["status"]] += 1
+                    outputs.append(out)
                 browser.close()
-            return jsonify({
+            return _json({
                 "status": "success",
                 "agent": "BroncoMCP/1.0",
-                "executed": outputs
-            }), 200
+                "executed": outputs,
+                "summary": {"total": len(outputs), **counts},
+            }, 200)
         except Exception as e:
             app.logger.exception("steps execution failed")
             return _bad_request("Steps execution failed", {"error": str(e)}, code=200)
@@ -604,7 +1181,7 @@ def api_run():
     # if we got here, payload was understood but incomplete
     return _bad_request(
         "Invalid payload for /api/run. Provide one of: "
-        "{goal: string} | {navigate: url} | {steps: [ ... ]}",
+        "{goal: string} | {navigate: url} | {steps: [ ... ]} | {goals: [string, ...]}",
         extra={"received_keys": list(data.keys())}
     )
 
@@ -612,26 +1189,38 @@ def api_run():
 # ------------------------------------------------------------------------------
 # Error Pages
 # ------------------------------------------------------------------------------
+def _is_api_path(path: str) -> bool:
+    """Machine-facing URL (JSON error bodies) vs. browser page (HTML error page)."""
+    return path.startswith("/api/") or path.endswith(".json")
+
+
+_ERROR_PAGE = None
+
+
+def _error_page() -> bytes:
+    """
+    HTML body for 404/500 pages: login.html rendered once, in a blank request
+    context so no user's flash messages get baked into the cached bytes.
+    """
+    global _ERROR_PAGE
+    if _ERROR_PAGE is None:
+        with app.test_request_context("/"):
+            _ERROR_PAGE = render_template("login.html").encode()
+    return _ERROR_PAGE
+
+
 @app.errorhandler(404)
 def _404(_e):
-    if request.path.startswith('/api/'):
-        return jsonify({
-            "status": "error",
-            "message": "Endpoint not found",
-            "agent": "BroncoMCP/1.0"
-        }), 404
-    return render_template("login.html"), 404
+    if _is_api_path(request.path):
+        return _json(_ERR_NOT_FOUND, 404)
+    return Response(_error_page(), status=404, mimetype="text/html")
 
 
 @app.errorhandler(500)
 def _500(_e):
-    if request.path.startswith('/api/'):
-        return jsonify({
-            "status": "error",
-            "message": "Internal server error",
-            "agent": "BroncoMCP/1.0"
-        }), 500
-    return render_template("login.html"), 500
+    if _is_api_path(request.path):
+        return _json(_ERR_INTERNAL, 500)
+    return Response(_error_page(), status=500, mimetype="text/html")
 
 
 @app.errorhandler(TemplateNotFound)
@@ -643,6 +1232,10 @@ def _template_missing(e):
 # ------------------------------------------------------------------------------
 # Run app
 # ------------------------------------------------------------------------------
+# Schema + admin seed at import so WSGI servers (gunicorn app:app) get them too;
+# with --preload this runs once in the master before the workers fork.
+init_db()
+
 if __name__ == "__main__":
     print("\n🚀 Starting Robot Driver API...")
     print(f"📁 Base directory: {BASE_DIR}")
@@ -652,13 +1245,11 @@ if __name__ == "__main__":
     print(f"🛡️  CSP Mode: {'RELAXED' if RELAXED_CSP else 'STRICT'}")
     print("-" * 50)
 
-    init_db()
-    ensure_default_admin()
-
     print("\n✅ Server ready!")
     print("📍 Access at: http://localhost:5001")
     print("🔓 Login with: admin / admin123")
     print("🏥 Health check: http://localhost:5001/api/health\n")
 
-    # Use threaded mode for better performance with Playwright
+    # Development server. For production use gunicorn (see gunicorn_conf.py):
+    #   gunicorn -c gunicorn_conf.py app:app
     app.run(host="0.0.0.0", port=5001, debug=False, threaded=True)
\ No newline at end of file
@@ -0,0 +1,229 @@
+# browser_pool.py
+"""
+Process-wide warm Chromium shared by the async Playwright drivers
+(login_driver, mcp_agent).
+
+One event loop runs on a daemon thread and owns the Playwright instance and
+the browser, so Chromium is launched once per process instead of once per
+request. Sync callers hand coroutines to that loop with run(); inside them,
+`async with new_context(...)` gives each job its own BrowserContext (cookies,
+storage) and closes it afterwards.
+
+Public API:
+  - run(coro, timeout=None)       -> result of coro, executed on the pool loop
+  - get_browser()                 -> coroutine returning the shared Browser
+  - new_context(block_assets=True, **context_kwargs)
+                                  -> async context manager yielding a BrowserContext
+  - shared_page(name, block_assets=True, **context_kwargs)
+                                  -> async context manager yielding a Page in the
+                                     long-lived context for flow `name`
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import re
+import threading
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+from ttl_cache import TTLCache
+
+HEADLESS_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+]
+
+# Images, fonts and media the scrapers never read. Routed by URL pattern rather
+# than a catch-all "**/*" handler, so documents/scripts/CSS aren't intercepted
+# at all (no per-request round trip through the route handler).
+HEAVY_ASSET_RE = re.compile(
+    r"\.(?:png|jpe?g|gif|webp|svg|ico|woff2?|ttf|otf|eot|mp4|webm|mp3)(?:[?#]|$)", re.IGNORECASE
+)
+
+# CSS/JS shared by every context in the process, so repeat visits (each job
+# gets a fresh context, hence a cold HTTP cache) are fulfilled from memory.
+STATIC_ASSET_RE = re.compile(r"\.(?:css|js)(?:[?#]|$)", re.IGNORECASE)
+ASSET_CACHE_MAX_BYTES = 2 * 1024 * 1024  # per asset; bigger ones just pass through
+asset_cache = TTLCache(maxsize=64, ttl=3600)  # url -> route.fulfill() kwargs
+
+# Replayed with a cached body: the type plus what a crossorigin <script>/<link>
+# needs. Bodies come back decoded, so encoding/length headers are never replayed.
+_REPLAY_HEADERS = (
+    "content-type",
+    "access-control-allow-origin",
+    "access-control-allow-credentials",
+    "cross-origin-resource-policy",
+    "timing-allow-origin",
+)
+
+_loop = None
+_loop_lock = threading.Lock()
+_pw = None
+_browser = None
+_browser_lock = None  # asyncio.Lock, created on the pool loop
+
+# Flows that don't need cookie isolation share one context and only open a page
+# per job; name -> (BrowserContext, asyncio.Semaphore bounding its open pages)
+MAX_PAGES_PER_CTX = int(os.environ.get("BROWSER_MAX_PAGES", "4"))
+_shared = {}
+_shared_lock = None  # asyncio.Lock, created on the pool loop
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="browser-pool", daemon=True).start()
+    return _loop
+
+
+def run(coro, timeout: float = None):
+    """Run `coro` on the pool loop and wait for its result (cancelled on timeout)."""
+    fut = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return fut.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        fut.cancel()
+        raise
+
+
+async def get_browser():
+    """The shared headless Chromium; (re)launched on first use or after a crash."""
+    global _pw, _browser, _browser_lock
+    if _browser_lock is None:
+        _browser_lock = asyncio.Lock()
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _pw is None:
+                _pw = await async_playwright().start()
+            _browser = await _pw.chromium.launch(headless=True, args=HEADLESS_ARGS)
+    return _browser
+
+
+async def _abort(route):
+    await route.abort()
+
+
+async def block_heavy_assets(context):
+    await context.route(HEAVY_ASSET_RE, _abort)
+
+
+def cached_asset(url: str):
+    """route.fulfill() kwargs for a cached CSS/JS response, or None on a miss."""
+    return asset_cache.get(url)
+
+
+def store_asset(url: str, status: int, headers: dict, body: bytes):
+    """
+    Cache a fetched CSS/JS response and return its route.fulfill() kwargs, or
+    None if it shouldn't be cached: not a 200, too big, or CORS-allowed for one
+    specific origin (replaying that to another origin would break the load).
+    Shared by the async handler below and robot_driver's sync one.
+    """
+    if status != 200 or len(body) > ASSET_CACHE_MAX_BYTES:
+        return None
+    if headers.get("access-control-allow-origin", "*") != "*":
+        return None
+    entry = {"status": 200, "headers": {k: headers[k] for k in _REPLAY_HEADERS if k in headers}, "body": body}
+    asset_cache.set(url, entry)
+    return entry
+
+
+async def _serve_static(route):
+    request = route.request
+    if request.method != "GET":
+        await route.continue_()
+        return
+    hit = cached_asset(request.url)
+    if hit is None:
+        response = await route.fetch()
+        body = await response.body()
+        hit = store_asset(request.url, response.status, response.headers, body)
+        if hit is None:
+            await route.fulfill(response=response, body=body)
+            return
+    await route.fulfill(**hit)
+
+
+async def cache_static_assets(context):
+    await context.route(STATIC_ASSET_RE, _serve_static)
+
+
+@asynccontextmanager
+async def new_context(block_assets: bool = True, **context_kwargs):
+    browser = await get_browser()
+    context = await browser.new_context(**context_kwargs)
+    try:
+        if block_assets:
+            await block_heavy_assets(context)
+            await cache_static_assets(context)
+        yield context
+    finally:
+        await context.close()
+
+
+async def get_context(name: str, block_assets: bool = True, **context_kwargs):
+    """
+    (context, semaphore) for flow `name`, created on first use and recreated if
+    the browser was relaunched. Cookies and storage persist across its jobs.
+    """
+    global _shared_lock
+    if _shared_lock is None:
+        _shared_lock = asyncio.Lock()
+    async with _shared_lock:
+        browser = await get_browser()
+        entry = _shared.get(name)
+        if entry is None or entry[0].browser is not browser:
+            context = await browser.new_context(**context_kwargs)
+            if block_assets:
+                await block_heavy_assets(context)
+                await cache_static_assets(context)
+            entry = _shared[name] = (context, asyncio.Semaphore(MAX_PAGES_PER_CTX))
+    return entry
+
+
+@asynccontextmanager
+async def shared_page(name: str, block_assets: bool = True, **context_kwargs):
+    context, sem = await get_context(name, block_assets, **context_kwargs)
+    async with sem:
+        page = await context.new_page()
+        try:
+            yield page
+        finally:
+            await page.close()
+
+
+async def _shutdown():
+    global _pw, _browser
+    _shared.clear()
+    if _browser is not None:
+        await _browser.close()
+    if _pw is not None:
+        await _pw.stop()
+    _pw = _browser = None
+
+
+@atexit.register
+def _close_browser():
+    if _loop is not None and _browser is not None:
+        try:
+            run(_shutdown(), timeout=5)
+        except Exception:
+            pass
+
+
+def _reset_after_fork():
+    # The loop thread and browser belong to the parent; a child starts fresh
+    global _loop, _pw, _browser, _browser_lock, _shared_lock
+    _loop = _pw = _browser = _browser_lock = _shared_lock = None
+    _shared.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
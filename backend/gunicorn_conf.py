@@ -0,0 +1,25 @@
+# gunicorn_conf.py
+"""
+gunicorn settings for the Robot Driver API (used by the Dockerfile):
+
+    gunicorn -c gunicorn_conf.py app:app
+
+Threaded workers suit the I/O-bound endpoints (scrapes, Playwright runs);
+preload_app runs init_db, the admin seed and template warm-up once in the
+master before the workers fork.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5001")
+
+# Every worker can drive its own Chromium, so WEB_CONCURRENCY (set in the
+# Dockerfile) is the knob to keep memory in check on small hosts.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+preload_app = True
+timeout = 120  # Playwright searches can legitimately take tens of seconds
+keepalive = 5
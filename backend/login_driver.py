@@ -1,29 +1,79 @@
 # login_driver.py
-import asyncio
-from playwright.async_api import async_playwright
+import hashlib
+import hmac
+import logging
+import os
+
+from playwright.async_api import TimeoutError as PWTimeoutError
+
+import browser_pool
+from ttl_cache import TTLCache
 
 CUSTOM_UA = "BroncoBot/1.0 (+https://github.com/mon-sarder/BroncoFit)"
+LOGIN_TIMEOUT_S = 60
+# .error-message-container is always in the login form; the h3 inside only on failure
+LOGIN_OUTCOME_SELECTOR = ".title, [data-test='error']"
+
+LOGIN_URL = "https://www.saucedemo.com/"
+INVENTORY_URL = "https://www.saucedemo.com/inventory.html"
+
+logger = logging.getLogger(__name__)
+
+# Storage state (cookies + localStorage) of recent successful logins, keyed by
+# an HMAC of the credentials so a different password never reuses a session.
+# Memory only: nothing credential-derived is written to disk.
+_STATE_SECRET = os.urandom(32)
+_login_states = TTLCache(maxsize=64, ttl=300)
+
+
+def _state_key(username, password) -> bytes:
+    return hmac.new(_STATE_SECRET, f"{username}\0{password}".encode(), hashlib.sha256).digest()
+
+
+async def _resume_session(state) -> bool:
+    """True if `state` still opens the inventory page without logging in again."""
+    async with browser_pool.new_context(user_agent=CUSTOM_UA, storage_state=state) as context:
+        page = await context.new_page()
+        await page.goto(INVENTORY_URL)
+        try:
+            await page.wait_for_selector(".title", timeout=5000)
+        except PWTimeoutError:
+            return False
+        return "Products" in await page.inner_text(".title")
+
 
 async def _login_async(username, password, agent):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent=CUSTOM_UA)
+    key = _state_key(username, password)
+    state = _login_states.get(key)
+    if state is not None:
+        if await _resume_session(state):
+            return {"status": "success", "message": "Login successful!", "agent": agent}
+        _login_states.pop(key)
+
+    # Shared warm browser; only the context is per call
+    async with browser_pool.new_context(user_agent=CUSTOM_UA) as context:
         page = await context.new_page()
 
         # Example: dummy login test site
-        await page.goto("https://www.saucedemo.com/")
+        await page.goto(LOGIN_URL)
         await page.fill("#user-name", username)
         await page.fill("#password", password)
         await page.click("#login-button")
-        await page.wait_for_load_state("networkidle")
+        # Wait for the inventory title or the error banner, not for networkidle
+        # (the inventory page keeps background requests going well past render)
+        try:
+            await page.wait_for_selector(LOGIN_OUTCOME_SELECTOR, timeout=5000)
+        except PWTimeoutError:
+            pass
 
         text = await page.inner_text("body")
         status = "success" if "Products" in text else "error"
         msg = "Login successful!" if status == "success" else "Login failed."
+        if status == "success":
+            _login_states.set(key, await context.storage_state())
 
-        await browser.close()
         return {"status": status, "message": msg, "agent": agent}
 
 def run_login_test(username, password, agent="BroncoMCP/1.0"):
-    print(f"[{agent}] Running login test for user '{username}' ...")
-    return asyncio.run(_login_async(username, password, agent))
+    logger.info("Running login test user=%s agent=%s", username, agent)
+    return browser_pool.run(_login_async(username, password, agent), timeout=LOGIN_TIMEOUT_S)
@@ -3,44 +3,89 @@
 A lightweight "AI Brain" that executes a goal in a single, fast Playwright session.
 
 This module is intentionally minimal and speed-tuned:
-- Headless Chromium with slim flags
+- Headless Chromium with slim flags, kept warm by browser_pool (one page per goal)
 - Tight timeouts (3s / 5s)
 - domcontentloaded navigation
 - Batches steps rather than many tool calls
+- "list categories" / "search for X" goals go to robot_driver's HTTP scrapers first
 
 Public API:
   - run_ai_goal(goal: str, planner: str = "builtin", headless: bool = True) -> dict
+  - run_many(goals: list, planner: str = "builtin", headless: bool = True) -> list
 """
 
-import re
 import asyncio
-import traceback
+import logging
+import re
 from contextlib import asynccontextmanager
 from typing import Dict, Any
 
 from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
 
-# Reuse the same UA as robot_driver; fall back if not importable.
+import browser_pool
+from browser_pool import HEADLESS_ARGS
+from ttl_cache import TTLCache
+
+# Reuse the same UA (and the in-process scrapers) as robot_driver; fall back if not importable.
 try:
-    from robot_driver import CUSTOM_UA
+    from robot_driver import CUSTOM_UA, list_categories_http, search_product_http
 except Exception:
     CUSTOM_UA = "BroncoBot/1.0 (+https://github.com/mon-sarder/BroncoFit)"
+    list_categories_http = search_product_http = None
 
 DEFAULT_TIMEOUT_MS = 5000
 DEFAULT_NAV_TIMEOUT_MS = 7000
-HEADLESS_ARGS = [
-    "--no-sandbox",
-    "--disable-dev-shm-usage",
-    "--disable-gpu",
-    "--disable-extensions",
-]
+GOAL_TIMEOUT_S = 90
+MAX_PARALLEL_GOALS = 4  # goal pages open at once in the shared "agent" context in run_many()
+
+logger = logging.getLogger(__name__)
+
+# Recent goal results keyed by (whitespace/case-normalized goal, headless).
+# Only "success"/"noop" outcomes are kept, so a failed run is retried next time.
+_goal_cache = TTLCache(maxsize=256, ttl=60)
+
+# Category/search term in a (lower-cased) goal, e.g. "search for travel"
+# (\b: "do research on x" is not a search)
+_GOAL_RE = re.compile(r"\b(?:category|search|find|show)\s+(?:for\s+)?['\"]?([a-zA-Z ]+)['\"]?")
+
+# Reads the first 10 product pods in a single browser round trip
+_COLLECT_ITEMS_JS = """() => Array.from(document.querySelectorAll('.product_pod'))
+  .slice(0, 10)
+  .map(p => {
+    const a = p.querySelector('h3 a');
+    const price = p.querySelector('.price_color');
+    if (!a || !price) return null;
+    return {title: (a.getAttribute('title') || a.innerText).trim(), price: price.innerText.trim()};
+  })
+  .filter(Boolean)"""
+
+# Static reply for health-check goals; built once instead of on every call.
+_HEALTH_NOOP = {
+    "status": "noop",
+    "message": "Health checks should use the dedicated /api/health endpoint or check_health MCP tool",
+    "url": "http://localhost:5001/api/health"
+}
 
 
 @asynccontextmanager
 async def _fast_ctx(headless: bool = True):
+    """
+    Page per goal. Headless goals open it in browser_pool's shared "agent"
+    context (goals all act as the same local admin, so the login cookie is
+    reused); a headed (debugging) run still launches its own visible browser.
+    """
+    if headless:
+        async with browser_pool.shared_page("agent", user_agent=CUSTOM_UA) as page:
+            page.set_default_timeout(DEFAULT_TIMEOUT_MS)
+            page.set_default_navigation_timeout(DEFAULT_NAV_TIMEOUT_MS)
+            yield page.context.browser, page.context, page
+        return
+
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=headless, args=HEADLESS_ARGS)
+        browser = await p.chromium.launch(headless=False, args=HEADLESS_ARGS)
         context = await browser.new_context(user_agent=CUSTOM_UA)
+        await browser_pool.block_heavy_assets(context)
+        await browser_pool.cache_static_assets(context)
         context.set_default_timeout(DEFAULT_TIMEOUT_MS)
         context.set_default_navigation_timeout(DEFAULT_NAV_TIMEOUT_MS)
         page = await context.new_page()
@@ -54,6 +99,54 @@ async def _goto(page, url: str):
     await page.goto(url, wait_until="domcontentloaded")
 
 
+# ---------------------- HTTP fast path ----------------------
+
+def _is_health_goal(goal_l: str) -> bool:
+    # ("api" also covers "/api/health", so no separate scan for it)
+    return "health" in goal_l and ("check" in goal_l or "api" in goal_l)
+
+
+def invalidate_cache():
+    """Forget cached goal results (e.g. between tests)."""
+    _goal_cache.clear()
+
+
+def _http_fast_path(goal: str):
+    """
+    Answer "list categories" / "search for X" goals with robot_driver's
+    HTTP-only scrapers, in the same shape the browser executor returns. Calling them directly, rather than this app's own
+    /categories.json and /search-json, needs no API key and stays out of the
+    per-address rate limit. None means the goal isn't one of those, or the
+    lookup failed: use the browser executor.
+    """
+    if search_product_http is None:
+        return None
+    goal_l = goal.lower()
+    if _is_health_goal(goal_l):
+        return None
+    try:
+        if "list" in goal_l and "categor" in goal_l:
+            cats = list_categories_http()
+            if cats:
+                return {"status": "success", "action": "list_categories", "categories": cats, "count": len(cats)}
+            return None
+        m = _GOAL_RE.search(goal_l)
+        if m and m.group(1).strip():
+            # HTTP only: Playwright stays with the pooled executor
+            data = search_product_http(m.group(1).strip(), 10)
+            items = (data or {}).get("items") or []
+            if items and data.get("status") == "success":
+                return {
+                    "status": "success",
+                    "action": "collect_items",
+                    "count": len(items),
+                    "items": items
+                }
+    except Exception as e:
+        logger.warning("Goal fast path failed, using the browser: %s", e)
+    return None
+
+
 # ---------------------- Builtin goal executor ----------------------
 
 async def _builtin_executor(goal: str, headless: bool = True) -> Dict[str, Any]:
@@ -67,12 +160,8 @@ async def _builtin_executor(goal: str, headless: bool = True) -> Dict[str, Any]:
     goal_l = goal.lower()
 
     # Special case: health check requests
-    if "health" in goal_l and ("check" in goal_l or "api" in goal_l or "/api/health" in goal_l):
-        return {
-            "status": "noop",
-            "message": "Health checks should use the dedicated /api/health endpoint or check_health MCP tool",
-            "url": "http://localhost:5001/api/health"
-        }
+    if _is_health_goal(goal_l):
+        return dict(_HEALTH_NOOP)
 
     try:
         async with _fast_ctx(headless=headless) as (_b, _c, page):
@@ -96,14 +185,17 @@ async def _builtin_executor(goal: str, headless: bool = True) -> Dict[str, Any]:
                     "url": target
                 }
 
+            # Shared by the login form and the search form
+            submit_btn = page.locator('button[type="submit"]')
+
             # 2) If login page appears, use default admin creds (your app creates them)
             try:
                 if "login" in (page.url or "").lower():
                     username_input = page.locator('input[name="username"]')
                     password_input = page.locator('input[name="password"]')
-                    submit_btn = page.locator('button[type="submit"]')
 
-                    if await username_input.count() and await password_input.count() and await submit_btn.count():
+                    # All three probes in flight at once rather than back to back
+                    if all(await asyncio.gather(username_input.count(), password_input.count(), submit_btn.count())):
                         await username_input.fill("admin")
                         await password_input.fill("admin123")
                         await submit_btn.click()
@@ -125,12 +217,9 @@ async def _builtin_executor(goal: str, headless: bool = True) -> Dict[str, Any]:
                 # Read category chips/buttons
                 chips = page.locator(".category-list a, .chips .chip, .category-chip")
                 try:
-                    if await chips.count():
-                        cats = []
-                        count = await chips.count()
-                        for i in range(min(count, 100)):  # Limit to prevent hanging
-                            text = await chips.nth(i).inner_text()
-                            cats.append(text.strip())
+                    # One round trip for every chip's text instead of one per chip
+                    cats = [t.strip() for t in (await chips.all_inner_texts())[:100]]  # Limit to prevent hanging
+                    if cats:
                         return {
                             "status": "success",
                             "action": "list_categories",
@@ -145,37 +234,31 @@ async def _builtin_executor(goal: str, headless: bool = True) -> Dict[str, Any]:
                     }
 
             # 4) extract desired category from goal, e.g., "travel", "science"
-            m = re.search(r"(?:category|search|find|show)\s+(?:for\s+)?['\"]?([a-zA-Z ]+)['\"]?", goal_l)
+            m = _GOAL_RE.search(goal_l)
             desired = m.group(1).strip() if m else None
 
             if desired:
                 # Try the plain search bar first
                 query_input = page.locator('input[name="query"]')
-                if await query_input.count():
+                n_query, n_submit = await asyncio.gather(query_input.count(), submit_btn.count())
+                if n_query:
                     try:
                         await query_input.fill(desired)
-                        submit = page.locator('button[type="submit"]')
-                        if await submit.count():
-                            await submit.first.click()
+                        if n_submit:
+                            await submit_btn.first.click()
                             await page.wait_for_load_state("domcontentloaded", timeout=5000)
                     except Exception:
                         pass
 
                 # If the page shows "Available categories", click the closest chip if rendered
                 choices = page.locator(".category-list a, .chips .chip")
-                if await choices.count():
+                texts = (await choices.all_inner_texts())[:100]
+                if texts:
                     try:
                         # Pick the first chip that fuzzy matches desired
-                        texts = []
-                        count = await choices.count()
-                        for i in range(min(count, 100)):
-                            t = await choices.nth(i).inner_text()
-                            texts.append(t)
-
                         pick_idx = None
-                        d = desired.lower()
                         for idx, t in enumerate(texts):
-                            if d in t.lower():
+                            if desired in t.lower():  # desired comes from goal_l, already lowercase
                                 pick_idx = idx
                                 break
                         if pick_idx is None and texts:
@@ -188,36 +271,19 @@ async def _builtin_executor(goal: str, headless: bool = True) -> Dict[str, Any]:
                         pass
 
             # 5) Gather first few items if present (Books to Scrape format)
-            pods = page.locator(".product_pod, article.product_pod")
-            if await pods.count():
-                try:
-                    items = []
-                    count = await pods.count()
-                    for i in range(min(count, 10)):  # Limit to first 10
-                        pod = pods.nth(i)
-                        title_elem = pod.locator("h3 a, .product_pod h3 a")
-                        price_elem = pod.locator(".price_color")
-
-                        if await title_elem.count() and await price_elem.count():
-                            title = await title_elem.first.get_attribute("title")
-                            if not title:
-                                title = await title_elem.first.inner_text()
-                            price = await price_elem.first.inner_text()
-                            items.append({
-                                "title": title.strip(),
-                                "price": price.strip()
-                            })
-
-                    if items:
-                        return {
-                            "status": "success",
-                            "action": "collect_items",
-                            "count": len(items),
-                            "items": items,
-                            "url": page.url
-                        }
-                except Exception as e:
-                    pass
+            # Title (title attr, else text) + price for the first 10 pods in one evaluate
+            try:
+                items = await page.evaluate(_COLLECT_ITEMS_JS)
+            except Exception:
+                items = []
+            if items:
+                return {
+                    "status": "success",
+                    "action": "collect_items",
+                    "count": len(items),
+                    "items": items,
+                    "url": page.url
+                }
 
             # Nothing matched or found
             return {
@@ -227,21 +293,43 @@ async def _builtin_executor(goal: str, headless: bool = True) -> Dict[str, Any]:
             }
 
     except Exception as e:
+        # Stack goes to the log (formatted on the listener thread), not to the client
+        logger.exception("goal executor failed")
         return {
             "status": "error",
-            "message": f"Executor error: {str(e)}",
-            "traceback": traceback.format_exc()
+            "message": "Executor error",
+            "details": str(e)
         }
 
 
 # ---------------------- Public API ----------------------
 
+def _goal_key(goal: str, headless: bool):
+    return (" ".join(goal.lower().split()), headless)
+
+
+def _remember(key, result: Dict[str, Any]):
+    if result.get("status") in ("success", "noop"):
+        _goal_cache.set(key, result)
+
+
 def run_ai_goal(goal: str, planner: str = "builtin", headless: bool = True) -> Dict[str, Any]:
     """
     Entry point called by Flask /api/run.
     - planner='builtin' runs a fast, single-session executor (recommended)
     - in future you could wire other planners that emit steps
+    Repeat goals within 60s are answered from _goal_cache; callers must not mutate the result.
     """
+    key = _goal_key(goal, headless)
+    cached = _goal_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Headed runs are for watching the browser, so they always use it
+    result = _http_fast_path(goal) if headless else None
+    if result is not None:
+        _remember(key, result)
+        return result
 
     async def _run():
         if planner == "builtin":
@@ -250,10 +338,61 @@ def run_ai_goal(goal: str, planner: str = "builtin", headless: bool = True) -> D
         return await _builtin_executor(goal, headless=headless)
 
     try:
-        return asyncio.run(_run())
+        # Runs on browser_pool's long-lived loop (where the warm browser lives)
+        result = browser_pool.run(_run(), timeout=GOAL_TIMEOUT_S)
     except Exception as e:
+        logger.exception("run_ai_goal failed")
         return {
             "status": "error",
-            "message": f"Failed to run goal: {str(e)}",
-            "traceback": traceback.format_exc()
-        }
\ No newline at end of file
+            "message": "Failed to run goal",
+            "details": str(e)
+        }
+    _remember(key, result)
+    return result
+
+
+def run_many(goals: list, planner: str = "builtin", headless: bool = True) -> list:
+    """
+    run_ai_goal() for several goals concurrently: each gets its own page in
+    browser_pool's shared "agent" context, at most MAX_PARALLEL_GOALS at a time
+    (browser_pool's BROWSER_MAX_PAGES also caps the pages open in that context).
+    Results come back in input order; cached goals are not re-run.
+    """
+    results = [None] * len(goals)
+    pending = []
+    for i, goal in enumerate(goals):
+        cached = _goal_cache.get(_goal_key(goal, headless))
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append(i)
+    if not pending:
+        return results
+
+    async def _gather():
+        sem = asyncio.Semaphore(MAX_PARALLEL_GOALS)
+
+        async def _run_one(goal):
+            async with sem:
+                # Fast path on a worker thread (its HTTP calls block), so the
+                # lookups for different goals overlap instead of queueing
+                if headless:
+                    result = await asyncio.to_thread(_http_fast_path, goal)
+                    if result is not None:
+                        return result
+                return await _builtin_executor(goal, headless=headless)
+
+        return await asyncio.gather(*[_run_one(goals[i]) for i in pending], return_exceptions=True)
+
+    rounds = -(-len(pending) // MAX_PARALLEL_GOALS)
+    try:
+        outcomes = browser_pool.run(_gather(), timeout=GOAL_TIMEOUT_S * rounds)
+    except Exception as e:
+        outcomes = [e] * len(pending)
+    for i, outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            results[i] = {"status": "error", "message": "Failed to run goal", "details": str(outcome)}
+        else:
+            _remember(_goal_key(goals[i], headless), outcome)
+            results[i] = outcome
+    return results
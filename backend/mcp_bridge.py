@@ -3,6 +3,8 @@
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from mcp.server.fastmcp import FastMCP
 
 BASE_URL = os.environ.get("ROBOT_BASE_URL", "http://localhost:5001")
@@ -12,8 +14,41 @@ HEADERS = {"Content-Type": "application/json"}
 if API_KEY:
     HEADERS["X-API-Key"] = API_KEY
 
+# One keep-alive session for every tool call (no new TCP connection per call).
+# Retries cover idempotent GETs only: re-POSTing a goal could run it twice.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset(["GET"])),
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Optional fast JSON (safe if unavailable): orjson encodes straight to bytes.
+# Decode errors are ValueErrors either way (unlike r.json()'s RequestException
+# subclass), so the tools catch ValueError alongside RequestException.
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+    _loads = json.loads
+
 app = FastMCP("RobotDriver")
 
+# Last /categories.json reply and its ETag, revalidated with If-None-Match
+_CAT_ETAG = None
+_CAT_VALUE = None
+
 
 @app.tool()
 def check_health() -> dict:
@@ -23,10 +58,10 @@ def check_health() -> dict:
     """
     url = f"{BASE_URL}/api/health"
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
+        r = SESSION.get(url, timeout=10)
         r.raise_for_status()
-        return r.json()
-    except requests.exceptions.RequestException as e:
+        return _loads(r.content)
+    except (requests.exceptions.RequestException, ValueError) as e:
         return {
             "status": "error",
             "message": f"Health check failed: {str(e)}"
@@ -42,10 +77,10 @@ def run_goal(goal: str, planner: str = "builtin") -> dict:
     url = f"{BASE_URL}/api/run"
     payload = {"goal": goal, "planner": planner}
     try:
-        r = requests.post(url, headers=HEADERS, data=json.dumps(payload), timeout=120)
+        r = SESSION.post(url, data=_dumps(payload), timeout=120)
         r.raise_for_status()
-        return r.json()
-    except requests.exceptions.RequestException as e:
+        return _loads(r.content)
+    except (requests.exceptions.RequestException, ValueError) as e:
         return {
             "status": "error",
             "message": f"Goal execution failed: {str(e)}"
@@ -74,10 +109,10 @@ def search_product(product: str, limit: int = 10) -> dict:
 
     payload = {"product": product, "limit": limit}
     try:
-        r = requests.post(url, headers=HEADERS, data=json.dumps(payload), timeout=60)
+        r = SESSION.post(url, data=_dumps(payload), timeout=60)
         r.raise_for_status()
-        return r.json()
-    except requests.exceptions.RequestException as e:
+        return _loads(r.content)
+    except (requests.exceptions.RequestException, ValueError) as e:
         return {
             "status": "error",
             "message": f"Search failed: {str(e)}",
@@ -89,13 +124,21 @@ def search_product(product: str, limit: int = 10) -> dict:
 def list_categories() -> dict:
     """
     Return available categories from /categories.json.
+    A 304 reuses the previous reply without downloading or parsing it again.
     """
+    global _CAT_ETAG, _CAT_VALUE
     url = f"{BASE_URL}/categories.json"
+    etag, value = _CAT_ETAG, _CAT_VALUE
     try:
-        r = requests.get(url, headers=HEADERS, timeout=30)
+        extra = {"If-None-Match": etag} if etag and value is not None else None
+        r = SESSION.get(url, headers=extra, timeout=30)
+        if r.status_code == 304 and value is not None:
+            return value
         r.raise_for_status()
-        return r.json()
-    except requests.exceptions.RequestException as e:
+        value = _loads(r.content)
+        _CAT_ETAG, _CAT_VALUE = r.headers.get("ETag"), value
+        return value
+    except (requests.exceptions.RequestException, ValueError) as e:
         return {
             "status": "error",
             "message": f"Failed to list categories: {str(e)}",
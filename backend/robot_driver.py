@@ -3,7 +3,15 @@
 # Updated to return multiple results from category pages.
 
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+import html
+import logging
 import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from browser_pool import HEAVY_ASSET_RE, STATIC_ASSET_RE, cached_asset, store_asset
+from ttl_cache import TTLCache
 
 BOOKS_ROOT = "https://books.toscrape.com/"
 AGENT_NAME = "BroncoMCP/1.0"
@@ -11,9 +19,135 @@ AGENT_NAME = "BroncoMCP/1.0"
 # Custom UA - can be overridden
 CUSTOM_UA = "BroncoBot/1.0 (+https://github.com/mon-sarder/BroncoFit)"
 
+logger = logging.getLogger(__name__)
+
+def _serve_static(route) -> None:
+    # Sync twin of browser_pool._serve_static; what to cache is decided there
+    request = route.request
+    if request.method != "GET":
+        route.continue_()
+        return
+    hit = cached_asset(request.url)
+    if hit is None:
+        response = route.fetch()
+        body = response.body()
+        hit = store_asset(request.url, response.status, response.headers, body)
+        if hit is None:
+            route.fulfill(response=response, body=body)
+            return
+    route.fulfill(**hit)
+
+def block_heavy_assets(context) -> None:
+    """
+    Abort image/font/media requests on a sync BrowserContext (text is all we read)
+    and serve CSS/JS from browser_pool's process-wide asset cache.
+    """
+    context.route(HEAVY_ASSET_RE, lambda route: route.abort())
+    context.route(STATIC_ASSET_RE, _serve_static)
+
+_WS_RE = re.compile(r"\s+")
+
 def _clean(text: str) -> str:
     """Normalize whitespace and trim text safely."""
-    return re.sub(r"\s+", " ", (text or "").strip())
+    return _WS_RE.sub(" ", (text or "").strip())
+
+def _category_links(page) -> list:
+    """
+    Sidebar category links as (name, lower-cased name, href) in page order,
+    read in a single browser round trip instead of one per link.
+    """
+    raw = page.eval_on_selector_all(
+        ".nav-list ul li a",
+        "els => els.map(e => [e.textContent, e.getAttribute('href') || ''])"
+    )
+    return [(name, name.lower(), href) for text, href in raw if (name := _clean(text))]
+
+def _unique_names(index: list) -> list:
+    """Category names from a _category_links() index, de-duplicated in page order."""
+    return list(dict.fromkeys(name for name, _lower, _href in index))
+
+# Sidebar category links on the home page; the top-level "Books" link
+# (catalogue/category/books_1/) doesn't match the "books/" prefix.
+_CAT_LINK_RE = re.compile(rb'href="(catalogue/category/books/[^"]+/index\.html)">\s*([^<]+?)\s*</a>')
+# Product pods on a category page: title attribute + price text
+_POD_MARK = b'<article class="product_pod">'
+_POD_RE = re.compile(
+    rb'<article class="product_pod">.*?<h3><a href="[^"]*" title="([^"]*)">.*?<p class="price_color">([^<]*)</p>',
+    re.DOTALL,
+)
+
+# Shared keep-alive session for plain-HTTP fetches (TLS handshake paid once)
+_HTTP = requests.Session()
+_HTTP.headers["User-Agent"] = CUSTOM_UA
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+))
+
+# Home-page category index for the HTTP paths (the sidebar rarely changes)
+_http_index = TTLCache(maxsize=1, ttl=300)
+
+def _category_index_http(timeout=(3, 6)) -> list:
+    """
+    Same (name, lower-cased name, href) index as _category_links(), built from the
+    home page HTML with one C-level regex scan over the raw bytes; cached 5 minutes.
+    Raises on network/HTTP errors so callers can fall back to Playwright.
+    """
+    index = _http_index.get("index")
+    if index is None:
+        resp = _HTTP.get(BOOKS_ROOT, timeout=timeout)
+        resp.raise_for_status()
+        index = []
+        for href, raw in _CAT_LINK_RE.findall(resp.content):
+            name = _clean(html.unescape(raw.decode("utf-8", "replace")))
+            if name:
+                index.append((name, name.lower(), href.decode("ascii", "replace")))
+        if index:
+            _http_index.set("index", index)
+    return index
+
+def list_categories_http(timeout=(3, 6)) -> list:
+    """Category names straight from the home page HTML (no browser), in page order."""
+    return _unique_names(_category_index_http(timeout))
+
+def search_product_http(category_query: str, limit: int, timeout=(3, 6)) -> dict | None:
+    """
+    search_product() without a browser: the site is server-rendered, so two GETs
+    (home page index, usually cached, + category page) and a regex scan suffice.
+    Returns None when the markup doesn't parse, so the caller uses Playwright.
+    """
+    index = _category_index_http(timeout)
+    if not index:
+        return None
+    target_url = _find_category_url(index, category_query)
+    if not target_url:
+        return category_choices(category_query, _unique_names(index))
+
+    resp = _HTTP.get(target_url, timeout=timeout)
+    resp.raise_for_status()
+    body = resp.content
+    items = []
+    for raw_title, raw_price in _POD_RE.findall(body):
+        title = _clean(html.unescape(raw_title.decode("utf-8", "replace")))
+        if title:
+            items.append({"title": title, "price": _clean(raw_price.decode("utf-8", "replace"))})
+        if limit and len(items) >= limit:
+            break
+    if not items:
+        return None
+
+    return {
+        "agent": AGENT_NAME,
+        "status": "success",
+        "category": category_query,
+        "items": items,
+        "meta": {
+            "count": len(items),
+            "available": body.count(_POD_MARK),
+            "note": f"Returned {len(items)} items (limit={limit}) from first page."
+        }
+    }
 
 def list_categories() -> dict:
     """
@@ -29,12 +163,11 @@ def list_categories() -> dict:
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(user_agent=CUSTOM_UA)
+        block_heavy_assets(context)
         page = context.new_page()
         try:
             page.goto(BOOKS_ROOT, timeout=12000, wait_until="domcontentloaded")
-            links = page.locator(".nav-list ul li a")
-            n = links.count()
-            cats = [_clean(links.nth(i).inner_text()) for i in range(n)]
+            cats = _unique_names(_category_links(page))
             return {
                 "agent": AGENT_NAME,
                 "status": "success",
@@ -60,34 +193,43 @@ def list_categories() -> dict:
         finally:
             browser.close()
 
-def _find_category_url(page, query: str) -> str | None:
+def _find_category_url(index: list, query: str) -> str | None:
     """
-    Try to find a category URL by exact or near match.
+    Try to find a category URL by exact or near match in a _category_links() index.
     Returns absolute URL or None if not found.
     """
-    links = page.locator(".nav-list ul li a")
-    n = links.count()
     query_l = (query or "").strip().lower()
     if not query_l:
         return None
 
     # First pass: exact (case-insensitive)
-    for i in range(n):
-        name = _clean(links.nth(i).inner_text())
-        if name.lower() == query_l:
-            href = links.nth(i).get_attribute("href") or ""
+    for _name, name_l, href in index:
+        if name_l == query_l:
             return BOOKS_ROOT + href
 
-    # Second pass: startswith / contains
-    for i in range(n):
-        name = _clean(links.nth(i).inner_text())
-        nl = name.lower()
-        if nl.startswith(query_l) or query_l in nl:
-            href = links.nth(i).get_attribute("href") or ""
+    # Second pass: contains (covers startswith)
+    for _name, name_l, href in index:
+        if query_l in name_l:
             return BOOKS_ROOT + href
 
     return None
 
+def category_choices(category_query: str, cats: list) -> dict:
+    """The "status": "choices" reply for a query that matches no category."""
+    return {
+        "agent": AGENT_NAME,
+        "status": "choices",
+        "category": category_query,
+        "items": [],
+        "categories": list(cats),
+        "message": f"No close category match for '{category_query}'. Pick one of the available categories.",
+        "meta": {
+            "count": 0,
+            "available": 0,
+            "note": "No category match found"
+        }
+    }
+
 def search_product(product: str, limit: int = 10) -> dict:
     """
     Scrape books within a category. Returns up to `limit` items (default 10).
@@ -103,35 +245,31 @@ def search_product(product: str, limit: int = 10) -> dict:
     category_query = (product or "").strip()
     items: list[dict] = []
 
+    # Fast path: plain HTTP + regex; the browser only if that fails or can't parse
+    try:
+        result = search_product_http(category_query, limit)
+        if result is not None:
+            return result
+        logger.warning("HTTP search found no products for %r, using Playwright", category_query)
+    except Exception as e:
+        logger.warning("HTTP search failed, using Playwright: %s", e)
+
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(user_agent=CUSTOM_UA)
+        block_heavy_assets(context)
         page = context.new_page()
         try:
             # 1) Home
             page.goto(BOOKS_ROOT, timeout=12000, wait_until="domcontentloaded")
 
             # 2) Find category URL
-            target_url = _find_category_url(page, category_query)
+            index = _category_links(page)
+            target_url = _find_category_url(index, category_query)
 
             # If not found, return categories to help the caller
             if not target_url:
-                links = page.locator(".nav-list ul li a")
-                n = links.count()
-                cats = [_clean(links.nth(i).inner_text()) for i in range(n)]
-                return {
-                    "agent": AGENT_NAME,
-                    "status": "choices",
-                    "category": category_query,
-                    "items": [],
-                    "categories": cats,
-                    "message": f"No close category match for '{category_query}'. Pick one of the available categories.",
-                    "meta": {
-                        "count": 0,
-                        "available": 0,
-                        "note": "No category match found"
-                    }
-                }
+                return category_choices(category_query, _unique_names(index))
 
             # 3) Go to category page
             page.goto(target_url, timeout=12000, wait_until="domcontentloaded")
@@ -38,6 +38,7 @@ echo ""
 echo "📊 Step 5: Testing search endpoint..."
 curl -s -X POST http://localhost:$PORT/search-json \
   -H "Content-Type: application/json" \
+  -H "X-API-Key: $API_KEY" \
   -d '{"product":"Travel"}' | jq '.status, .category, .meta.count'
 
 echo ""
@@ -0,0 +1,61 @@
+# ttl_cache.py
+"""
+Tiny thread-safe TTL + LRU cache (stdlib only).
+
+Used for short-lived, process-local memoization in the Flask app and the
+drivers, where pulling in cachetools would be overkill.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Maps key -> value; entries expire after `ttl` seconds, oldest evicted past `maxsize`."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return default
+            if hit[0] <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return hit[1]
+
+    def set(self, key, value, ttl: float = None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            hit = self._data.pop(key, None)
+        return default if hit is None else hit[1]
+
+    def discard_where(self, predicate) -> int:
+        """Drop every entry whose value satisfies `predicate`; returns how many were dropped."""
+        with self._lock:
+            doomed = [k for k, (_exp, v) in self._data.items() if predicate(v)]
+            for k in doomed:
+                del self._data[k]
+        return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)